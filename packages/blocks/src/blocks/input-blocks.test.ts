@@ -358,8 +358,8 @@ describe('createPythonCodeForInputDateRangeBlock', () => {
     const result = createPythonCodeForInputDateRangeBlock(block)
 
     expect(result).toEqual(dedent`
-      from dateutil.parser import parse as _deepnote_parse
-      my_range = [_deepnote_parse('2024-01-01').date(), _deepnote_parse('2024-12-31').date()]
+      from datetime import date as _deepnote_date
+      my_range = [_deepnote_date.fromisoformat('2024-01-01'), _deepnote_date.fromisoformat('2024-12-31')]
     `)
   })
 
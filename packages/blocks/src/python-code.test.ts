@@ -546,7 +546,7 @@ describe('createPythonCode', () => {
       const result = createPythonCode(block)
 
       expect(result).toEqual(dedent`
-        from dateutil.parser import parse as _deepnote_parse
+        from datetime import date as _deepnote_date
         date_range_input = [None, None]
       `)
     })
@@ -1,8 +1,8 @@
 import { UnsupportedBlockTypeError } from './blocks'
-import { createPythonCodeForAgentBlock, isAgentBlock } from './blocks/agent-blocks'
-import { createPythonCodeForBigNumberBlock, isBigNumberBlock } from './blocks/big-number-blocks'
-import { type ButtonExecutionContext, createPythonCodeForButtonBlock, isButtonBlock } from './blocks/button-blocks'
-import { createPythonCodeForCodeBlock, isCodeBlock } from './blocks/code-blocks'
+import { createPythonCodeForAgentBlock } from './blocks/agent-blocks'
+import { createPythonCodeForBigNumberBlock } from './blocks/big-number-blocks'
+import { type ButtonExecutionContext, createPythonCodeForButtonBlock } from './blocks/button-blocks'
+import { createPythonCodeForCodeBlock } from './blocks/code-blocks'
 import {
   createPythonCodeForInputCheckboxBlock,
   createPythonCodeForInputDateBlock,
@@ -12,80 +12,39 @@ import {
   createPythonCodeForInputSliderBlock,
   createPythonCodeForInputTextareaBlock,
   createPythonCodeForInputTextBlock,
-  isInputCheckboxBlock,
-  isInputDateBlock,
-  isInputDateRangeBlock,
-  isInputFileBlock,
-  isInputSelectBlock,
-  isInputSliderBlock,
-  isInputTextareaBlock,
-  isInputTextBlock,
 } from './blocks/input-blocks'
-import { createPythonCodeForNotebookFunctionBlock, isNotebookFunctionBlock } from './blocks/notebook-function-blocks'
-import { createPythonCodeForSqlBlock, isSqlBlock } from './blocks/sql-blocks'
-import { createPythonCodeForVisualizationBlock, isVisualizationBlock } from './blocks/visualization-blocks'
+import { createPythonCodeForNotebookFunctionBlock } from './blocks/notebook-function-blocks'
+import { createPythonCodeForSqlBlock } from './blocks/sql-blocks'
+import { createPythonCodeForVisualizationBlock } from './blocks/visualization-blocks'
 import type { DeepnoteBlock } from './deepnote-file/deepnote-file-schema'
 
-export function createPythonCode(block: DeepnoteBlock, executionContext?: ButtonExecutionContext): string {
-  if (isAgentBlock(block)) {
-    return createPythonCodeForAgentBlock(block)
-  }
-
-  if (isCodeBlock(block)) {
-    return createPythonCodeForCodeBlock(block)
-  }
-
-  if (isSqlBlock(block)) {
-    return createPythonCodeForSqlBlock(block)
-  }
-
-  if (isInputTextBlock(block)) {
-    return createPythonCodeForInputTextBlock(block)
-  }
-
-  if (isInputTextareaBlock(block)) {
-    return createPythonCodeForInputTextareaBlock(block)
-  }
-
-  if (isInputCheckboxBlock(block)) {
-    return createPythonCodeForInputCheckboxBlock(block)
-  }
-
-  if (isInputSelectBlock(block)) {
-    return createPythonCodeForInputSelectBlock(block)
-  }
-
-  if (isInputSliderBlock(block)) {
-    return createPythonCodeForInputSliderBlock(block)
-  }
-
-  if (isInputFileBlock(block)) {
-    return createPythonCodeForInputFileBlock(block)
-  }
-
-  if (isInputDateBlock(block)) {
-    return createPythonCodeForInputDateBlock(block)
-  }
-
-  if (isInputDateRangeBlock(block)) {
-    return createPythonCodeForInputDateRangeBlock(block)
-  }
-
-  if (isVisualizationBlock(block)) {
-    return createPythonCodeForVisualizationBlock(block)
-  }
-
-  if (isButtonBlock(block)) {
-    return createPythonCodeForButtonBlock(block, executionContext)
-  }
-
-  if (isBigNumberBlock(block)) {
-    return createPythonCodeForBigNumberBlock(block)
-  }
+type CodeGenerator = (block: never, executionContext?: ButtonExecutionContext) => string
+
+// Every type guard behind the previous if-chain was a plain block.type
+// equality check, so a single map lookup dispatches equivalently instead of
+// comparing against up to 15 types per block.
+const CODE_GENERATORS: Record<string, CodeGenerator | undefined> = {
+  agent: createPythonCodeForAgentBlock,
+  code: createPythonCodeForCodeBlock,
+  sql: createPythonCodeForSqlBlock,
+  'input-text': createPythonCodeForInputTextBlock,
+  'input-textarea': createPythonCodeForInputTextareaBlock,
+  'input-checkbox': createPythonCodeForInputCheckboxBlock,
+  'input-select': createPythonCodeForInputSelectBlock,
+  'input-slider': createPythonCodeForInputSliderBlock,
+  'input-file': createPythonCodeForInputFileBlock,
+  'input-date': createPythonCodeForInputDateBlock,
+  'input-date-range': createPythonCodeForInputDateRangeBlock,
+  visualization: createPythonCodeForVisualizationBlock,
+  button: createPythonCodeForButtonBlock,
+  'big-number': createPythonCodeForBigNumberBlock,
+  'notebook-function': createPythonCodeForNotebookFunctionBlock,
+}
 
-  if (isNotebookFunctionBlock(block)) {
-    return createPythonCodeForNotebookFunctionBlock(block)
+export function createPythonCode(block: DeepnoteBlock, executionContext?: ButtonExecutionContext): string {
+  const generator = CODE_GENERATORS[block.type]
+  if (!generator) {
+    throw new UnsupportedBlockTypeError(`Creating python code from block type ${block.type} is not supported yet.`)
   }
-
-  throw new UnsupportedBlockTypeError(`Creating python code from block type ${block.type} is not supported yet.`)
+  return generator(block as never, executionContext)
 }
@@ -158,9 +158,11 @@ __deepnote_big_number__()
     const sanitizedName = sanitizePythonVariableName(name)
     const escapedStartDate = escapePythonString(startDate)
     const escapedEndDate = escapePythonString(endDate)
+    // Absolute range values are validated as ISO YYYY-MM-DD strings, so
+    // date.fromisoformat covers them without pulling in dateutil
     return dedent`
-      from dateutil.parser import parse as _deepnote_parse
-      ${sanitizedName} = [${startDate ? `_deepnote_parse(${escapedStartDate}).date()` : 'None'}, ${endDate ? `_deepnote_parse(${escapedEndDate}).date()` : 'None'}]
+      from datetime import date as _deepnote_date
+      ${sanitizedName} = [${startDate ? `_deepnote_date.fromisoformat(${escapedStartDate})` : 'None'}, ${endDate ? `_deepnote_date.fromisoformat(${escapedEndDate})` : 'None'}]
     `
   },
 }
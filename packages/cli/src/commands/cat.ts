@@ -212,11 +212,8 @@ async function printBlock(block: DeepnoteBlock, options: CatOptions): Promise<vo
         content = wrapAnsi(content, TEXT_BLOCK_MAX_WIDTH, { hard: true })
       }
       const highlighted = await highlightContent(content, block.type)
-      // Indent each line
-      const lines = highlighted.split('\n')
-      for (const line of lines) {
-        output(`  ${line}`)
-      }
+      // Indent each line and emit the whole block in a single write
+      output(`  ${highlighted.split('\n').join('\n  ')}`)
     } else if (content === '') {
       output(chalk.dim('  (empty)'))
     }
@@ -386,15 +386,14 @@ function printContentDiff(before: string | undefined, after: string | undefined,
       lines.pop()
     }
 
-    for (const line of lines) {
-      if (change.added) {
-        output(c.green(`        + ${line}`))
-      } else if (change.removed) {
-        output(c.red(`        - ${line}`))
-      } else {
-        output(c.gray(`          ${line}`))
-      }
+    if (lines.length === 0) {
+      continue
     }
+
+    // Prefix every line of the change and emit it as a single write
+    const prefix = change.added ? '        + ' : change.removed ? '        - ' : '          '
+    const colorize = change.added ? c.green : change.removed ? c.red : c.gray
+    output(colorize(lines.map(line => `${prefix}${line}`).join('\n')))
   }
 }
 
@@ -57,6 +57,9 @@ import {
 } from '../utils/metrics'
 import { openDeepnoteFileInCloud } from '../utils/open-file-in-cloud'
 
+/** Horizontal rule used around plan and summary sections, built once. */
+const SECTION_RULE = '─'.repeat(50)
+
 /**
  * Error thrown when required inputs are missing.
  * This is a user error (exit code 2), not a runtime error.
@@ -736,21 +739,25 @@ async function dryRunDeepnoteProject(path: string, options: RunOptions): Promise
   } else {
     const c = getChalk()
     output(c.bold('\nExecution Plan (dry run)'))
-    output(c.dim('─'.repeat(50)))
+    output(c.dim(SECTION_RULE))
 
     if (executableBlocks.length === 0) {
       output(c.yellow('No executable blocks found.'))
     } else {
+      // Render the whole plan as one string; large projects would otherwise
+      // pay one or two writes per block
+      const planLines: string[] = []
       for (let i = 0; i < executableBlocks.length; i++) {
         const block = executableBlocks[i]
-        output(`${c.cyan(`[${i + 1}/${executableBlocks.length}]`)} ${block.label}`)
+        planLines.push(`${c.cyan(`[${i + 1}/${executableBlocks.length}]`)} ${block.label}`)
         if (notebookCount > 1) {
-          output(c.dim(`    Notebook: ${block.notebook}`))
+          planLines.push(c.dim(`    Notebook: ${block.notebook}`))
         }
       }
+      output(planLines.join('\n'))
     }
 
-    output(c.dim('─'.repeat(50)))
+    output(c.dim(SECTION_RULE))
     output(c.dim(`Total: ${executableBlocks.length} block(s) would be executed`))
   }
 }
@@ -1355,7 +1362,7 @@ async function outputHumanRunSummary(
   engine: ExecutionEngine
 ): Promise<void> {
   const c = getChalk()
-  output(c.dim('─'.repeat(50)))
+  output(c.dim(SECTION_RULE))
 
   if (state.showTop && engine.serverPort) {
     const finalMetrics = await fetchMetrics(engine.serverPort)
@@ -247,8 +247,12 @@ describe('renderOutput', () => {
 
       renderOutput(output)
 
-      // First call is the error name/value, subsequent calls are traceback lines
-      expect(mockConsoleError).toHaveBeenCalledTimes(4)
+      // First call is the error name/value, second is the whole traceback
+      expect(mockConsoleError).toHaveBeenCalledTimes(2)
+      const tracebackCall = mockConsoleError.mock.calls[1][0] as string
+      expect(tracebackCall).toContain('File "test.py", line 1')
+      expect(tracebackCall).toContain('x = 1 + "a"')
+      expect(tracebackCall).toContain('TypeError: expected str')
     })
 
     it('strips ANSI codes from traceback', () => {
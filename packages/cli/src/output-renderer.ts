@@ -75,10 +75,9 @@ function renderErrorOutput(errorOutput: IError): void {
   logError(c.red(`${errorOutput.ename}: ${errorOutput.evalue}`))
 
   if (errorOutput.traceback && errorOutput.traceback.length > 0) {
-    for (const line of errorOutput.traceback) {
-      // Strip ANSI codes that might be in the traceback and apply our own styling
-      const cleanLine = stripVTControlCharacters(line)
-      logError(c.red(cleanLine))
-    }
+    // Strip ANSI codes that might be in the traceback and apply our own styling;
+    // emit the whole traceback as one write instead of one per line
+    const cleanTraceback = errorOutput.traceback.map(line => stripVTControlCharacters(line)).join('\n')
+    logError(c.red(cleanTraceback))
   }
 }
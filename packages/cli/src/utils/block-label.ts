@@ -46,13 +46,29 @@ export function getBlockLabel(block: DeepnoteBlock): string {
   return `${block.type} (${shortId(block.id)})`
 }
 
+/**
+ * Iterate over the lines of a string lazily.
+ * Label helpers usually stop at the first meaningful line, so this avoids
+ * materializing a full line array for very large cell contents.
+ */
+function* iterateLines(content: string): Generator<string> {
+  let start = 0
+  for (;;) {
+    const end = content.indexOf('\n', start)
+    if (end === -1) {
+      yield content.slice(start)
+      return
+    }
+    yield content.slice(start, end)
+    start = end + 1
+  }
+}
+
 /**
  * Get label for an agent block - show first non-empty line of the prompt.
  */
 function getAgentBlockLabel(content: string): string {
-  const lines = content.split('\n')
-
-  for (const line of lines) {
+  for (const line of iterateLines(content)) {
     const trimmed = line.trim()
     if (trimmed) {
       return truncate(`prompt: ${trimmed}`, MAX_LABEL_LENGTH)
@@ -66,10 +82,8 @@ function getAgentBlockLabel(content: string): string {
  * Get label for a code block - prefer first comment, fall back to first line.
  */
 function getCodeBlockLabel(content: string): string {
-  const lines = content.split('\n')
-
   // Look for first comment line (Python style)
-  for (const line of lines) {
+  for (const line of iterateLines(content)) {
     const trimmed = line.trim()
     if (trimmed.startsWith('#') && !trimmed.startsWith('#!')) {
       // Found a comment, use it as label
@@ -82,7 +96,7 @@ function getCodeBlockLabel(content: string): string {
   }
 
   // No comment found, use first non-empty line (skip shebangs)
-  for (const line of lines) {
+  for (const line of iterateLines(content)) {
     const trimmed = line.trim()
     if (trimmed.startsWith('#!')) {
       continue
@@ -99,9 +113,7 @@ function getCodeBlockLabel(content: string): string {
  * Get label for a SQL block - show first meaningful line.
  */
 function getSqlBlockLabel(content: string): string {
-  const lines = content.split('\n')
-
-  for (const line of lines) {
+  for (const line of iterateLines(content)) {
     const trimmed = line.trim()
     // Skip SQL comments
     if (trimmed.startsWith('--')) {
@@ -124,9 +136,7 @@ function getSqlBlockLabel(content: string): string {
  * Get label for a markdown block - show first line.
  */
 function getMarkdownBlockLabel(content: string): string {
-  const lines = content.split('\n')
-
-  for (const line of lines) {
+  for (const line of iterateLines(content)) {
     const trimmed = line.trim()
     if (trimmed) {
       return truncate(trimmed, MAX_LABEL_LENGTH)
@@ -4,14 +4,84 @@ import sys
 import argparse
 import re
 import builtins
-from jinja2 import meta, Environment
+from functools import lru_cache
 
+# orjson serializes/deserializes a few times faster than the stdlib json
+# module; fall back silently since the host interpreter may not have it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Set of Python built-in names to ignore during analysis
-BUILTINS_SET = set(dir(builtins))
 
+# Set of Python built-in names to ignore during analysis
+BUILTINS_SET = frozenset(dir(builtins))
+
+# Regexes compiled once at import so the per-block hot paths skip the
+# re module's pattern-cache lookup on every call.
+WHITESPACE_RE = re.compile(r"\s+")
+INVALID_CHARS_RE = re.compile(r"[^0-9a-zA-Z_]")
+MAGIC_LINE_RE = re.compile(r"^(?=[%!])", re.MULTILINE)
+JINJA_EXPRESSION_RE = re.compile(r"\{\{.*?\}\}")
+JINJA_STATEMENT_RE = re.compile(r"\{%.*?%\}", re.DOTALL)
+# The table name is captured in a lookahead so that an identifier that is
+# itself one of the keywords (e.g. "FROM {{var}} JOIN t" after template
+# cleanup) is still seen as the start of the next match.
+TABLE_NAME_RE = re.compile(
+    r"\b(?:FROM|JOIN|INTO|UPDATE)\s+(?=([a-zA-Z_][a-zA-Z0-9_]*))", re.IGNORECASE
+)
+SQL_KEYWORDS = frozenset(
+    [
+        "select",
+        "where",
+        "group",
+        "order",
+        "having",
+        "limit",
+        "offset",
+        "union",
+        "intersect",
+        "except",
+    ]
+)
+
+
+# Leaf grammar nodes that can never contain a Name/Attribute/def/import, so
+# the traversal never needs to enumerate their (empty) children. Usage
+# tracking needs Name nodes anywhere inside expressions, so larger expression
+# subtrees cannot be pruned wholesale.
+LEAF_NODE_TYPES = frozenset(
+    {ast.Constant}
+    | set(ast.expr_context.__subclasses__())
+    | set(ast.operator.__subclasses__())
+    | set(ast.boolop.__subclasses__())
+    | set(ast.unaryop.__subclasses__())
+    | set(ast.cmpop.__subclasses__())
+)
+
+
+class _ScopeExit:
+    """Traversal stack frame marking the end of a class or function scope."""
+
+    __slots__ = ("saved_globals",)
+
+    def __init__(self, saved_globals):
+        self.saved_globals = saved_globals
+
+
+class VariableVisitor:
+    # visit() is fully custom (see below), so there is no need to inherit
+    # from ast.NodeVisitor; slots make the per-node attribute accesses
+    # C-level lookups and drop the per-instance __dict__.
+    __slots__ = (
+        "global_vars",
+        "used_global_vars",
+        "imported_modules",
+        "imported_packages",
+        "scope_stack",
+        "function_globals",
+    )
 
-class VariableVisitor(ast.NodeVisitor):
     def __init__(self) -> None:
         self.global_vars = set()  # Variables defined globally
         self.used_global_vars = set()  # Variables used and defined globally
@@ -24,86 +94,49 @@ class VariableVisitor(ast.NodeVisitor):
         # If the scope stack is empty, we are at the global level
         return not self.scope_stack
 
+    # Handlers return False to skip descending into the node's children.
+
     def visit_Global(self, node):
         for name in node.names:
             self.function_globals.add(name)
-        self.generic_visit(node)
 
     def visit_Assign(self, node):
         for target in node.targets:
             if isinstance(target, ast.Name):
                 if self.current_scope_is_global():
                     self.global_vars.add(target.id)
-        self.generic_visit(node)
 
     def visit_AugAssign(self, node):
         if isinstance(node.target, ast.Name):
             if self.current_scope_is_global():
                 self.global_vars.add(node.target.id)
-        self.generic_visit(node)
 
     def visit_AnnAssign(self, node):
         target = node.target
         if isinstance(target, ast.Name) and self.current_scope_is_global():
             self.global_vars.add(target.id)
-        self.generic_visit(node)
 
     def visit_NamedExpr(self, node):
         if isinstance(node.target, ast.Name) and self.current_scope_is_global():
             self.global_vars.add(node.target.id)
-        self.generic_visit(node)
-
-    def visit_ClassDef(self, node):
-        if self.current_scope_is_global():
-            self.global_vars.add(node.name)
-        self.scope_stack.append(node.name)  # Enter class scope
-        self.generic_visit(node)
-        self.scope_stack.pop()  # Exit class scope
-
-    def visit_FunctionDef(self, node):
-        if self.current_scope_is_global():
-            self.global_vars.add(node.name)
-
-        prev_function_globals = self.function_globals
-        self.function_globals = set()
-
-        self.scope_stack.append(node.name)  # Enter function scope
-        self.generic_visit(node)
-        self.scope_stack.pop()  # Exit function scope
-
-        self.function_globals = prev_function_globals
-
-    def visit_AsyncFunctionDef(self, node):
-        if self.current_scope_is_global():
-            self.global_vars.add(node.name)
-
-        prev_function_globals = self.function_globals
-        self.function_globals = set()
-
-        self.scope_stack.append(node.name)  # Enter function scope
-        self.generic_visit(node)
-        self.scope_stack.pop()  # Exit function scope
-
-        self.function_globals = prev_function_globals
 
     def visit_Name(self, node):
-        if isinstance(node.ctx, ast.Load):
-            if node.id in BUILTINS_SET:
-                self.generic_visit(node)
-                return
-
-            if self.current_scope_is_global():
-                self.used_global_vars.add(node.id)
-            elif node.id in self.function_globals:
-                # Variable explicitly declared as global in current function
-                self.used_global_vars.add(node.id)
-            elif node.id in self.global_vars:
-                self.used_global_vars.add(node.id)
-        elif isinstance(node.ctx, ast.Store):
+        ctx_type = type(node.ctx)
+        if ctx_type is ast.Load:
+            name = node.id
+            # Scope checks first: most Load names are non-builtins, so the
+            # builtins lookup runs only for names that would be counted.
+            if (
+                not self.scope_stack
+                or name in self.function_globals  # declared global in current function
+                or name in self.global_vars
+            ):
+                if name not in BUILTINS_SET:
+                    self.used_global_vars.add(name)
+        elif ctx_type is ast.Store:
             # Only track variable assignments at global scope
-            if self.current_scope_is_global():
+            if not self.scope_stack:
                 self.global_vars.add(node.id)
-        self.generic_visit(node)
 
     def visit_Attribute(self, node):
         # Attributes are part of global usage if they are prefixed by a global variable
@@ -115,14 +148,14 @@ class VariableVisitor(ast.NodeVisitor):
                 self.used_global_vars.add(node.value.id)
             elif node.value.id in self.global_vars:
                 self.used_global_vars.add(node.value.id)
-        else:
-            self.generic_visit(node)
+            return False
 
     def visit_Import(self, node):
         for alias in node.names:
             self.imported_modules.add(alias.asname or alias.name)
             top_level = alias.name.split(".")[0]
             self.imported_packages.add(top_level)
+        return False
 
     def visit_ImportFrom(self, node):
         for alias in node.names:
@@ -130,20 +163,195 @@ class VariableVisitor(ast.NodeVisitor):
         if node.module:
             top_level = node.module.split(".")[0]
             self.imported_packages.add(top_level)
-
-
-def get_defined_used_variables(block):
+        return False
+
+    # Precomputed dispatch table so visit() does a single dict lookup per node
+    # instead of NodeVisitor's per-node "visit_" + class name getattr.
+    _VISITORS = {
+        ast.Global: visit_Global,
+        ast.Assign: visit_Assign,
+        ast.AugAssign: visit_AugAssign,
+        ast.AnnAssign: visit_AnnAssign,
+        ast.NamedExpr: visit_NamedExpr,
+        ast.Name: visit_Name,
+        ast.Attribute: visit_Attribute,
+        ast.Import: visit_Import,
+        ast.ImportFrom: visit_ImportFrom,
+    }
+
+    def visit(self, tree):
+        # Iterative pre-order walk in a single Python frame. The recursive
+        # NodeVisitor pays one call frame per AST node; here scope exits are
+        # explicit _ScopeExit frames on the traversal stack instead.
+        stack = [tree]
+        pop = stack.pop
+        visitors = self._VISITORS
+        while stack:
+            node = pop()
+            node_type = type(node)
+
+            if node_type in LEAF_NODE_TYPES:
+                continue
+
+            if node_type is _ScopeExit:
+                self.scope_stack.pop()
+                if node.saved_globals is not None:
+                    self.function_globals = node.saved_globals
+                continue
+
+            if node_type is ast.FunctionDef or node_type is ast.AsyncFunctionDef:
+                if not self.scope_stack:
+                    self.global_vars.add(node.name)
+                # Restore the enclosing function's globals once the subtree
+                # is fully processed.
+                stack.append(_ScopeExit(self.function_globals))
+                self.function_globals = set()
+                self.scope_stack.append(node.name)  # Enter function scope
+            elif node_type is ast.ClassDef:
+                if not self.scope_stack:
+                    self.global_vars.add(node.name)
+                stack.append(_ScopeExit(None))
+                self.scope_stack.append(node.name)  # Enter class scope
+            else:
+                visitor = visitors.get(node_type)
+                if visitor is not None and visitor(self, node) is False:
+                    continue
+
+            children = list(ast.iter_child_nodes(node))
+            if children:
+                children.reverse()  # Pop order == source order
+                stack.extend(children)
+
+
+def _analyze_tree(tree):
     visitor = VariableVisitor()
-    tree = ast.parse(block["content"])
     visitor.visit(tree)
     return (
-        visitor.global_vars,
-        visitor.used_global_vars,
-        visitor.imported_modules,
-        visitor.imported_packages,
+        frozenset(visitor.global_vars),
+        frozenset(visitor.used_global_vars),
+        frozenset(visitor.imported_modules),
+        frozenset(visitor.imported_packages),
     )
 
 
+@lru_cache(maxsize=512)
+def _analyze_code(code):
+    # Keyed by block content: re-analysis of unchanged blocks (the common
+    # case when a single cell is edited) becomes a dict hit instead of a
+    # parse + walk. Frozensets keep the cached values immutable.
+    return _analyze_tree(ast.parse(code))
+
+
+def get_defined_used_variables(block):
+    return _analyze_code(block["content"])
+
+
+# Sentinel assignment used to delimit blocks when they are parsed together.
+_BLOCK_BOUNDARY = "__deepnote_block_boundary__"
+
+
+def batch_analyze_code_blocks(codes):
+    """
+    Parse all code blocks as a single compile unit separated by sentinel
+    assignments, paying parser startup once instead of once per block.
+    Each delimited segment is analyzed with its own visitor, so the results
+    are identical to parsing the blocks individually.
+
+    Returns a dict mapping block content to its analysis result. Returns an
+    empty dict when the merged source cannot be split safely (e.g. a block
+    has a syntax error); callers then fall back to per-block parsing, which
+    keeps per-block error reporting intact.
+    """
+    unique_codes = []
+    seen = set()
+    for code in codes:
+        if code not in seen:
+            seen.add(code)
+            unique_codes.append(code)
+
+    if len(unique_codes) < 2:
+        return {}
+
+    pieces = []
+    for code in unique_codes:
+        if _BLOCK_BOUNDARY in code:
+            # The sentinel appearing in user code would corrupt the split
+            return {}
+        pieces.append(code)
+        pieces.append("\n%s = 0\n" % _BLOCK_BOUNDARY)
+
+    try:
+        tree = ast.parse("".join(pieces))
+    except (SyntaxError, ValueError):
+        return {}
+
+    segments = []
+    current = []
+    for stmt in tree.body:
+        if (
+            isinstance(stmt, ast.Assign)
+            and len(stmt.targets) == 1
+            and isinstance(stmt.targets[0], ast.Name)
+            and stmt.targets[0].id == _BLOCK_BOUNDARY
+        ):
+            segments.append(current)
+            current = []
+        else:
+            current.append(stmt)
+
+    if len(segments) != len(unique_codes) or current:
+        # A block swallowed a sentinel (e.g. an unterminated string closed
+        # by a later block); the split is unreliable
+        return {}
+
+    return {
+        code: _analyze_tree(ast.Module(body=segment, type_ignores=[]))
+        for code, segment in zip(unique_codes, segments)
+    }
+
+
+# Below this many code blocks a worker pool costs more to spin up than it
+# saves, so the single-process batch parse is used instead.
+PARALLEL_THRESHOLD = 64
+
+
+def _analyze_code_or_none(code):
+    # Worker wrapper: one unparsable block must not discard the whole map.
+    try:
+        return _analyze_code(code)
+    except SyntaxError:
+        return None
+
+
+def parallel_analyze_code_blocks(codes):
+    """
+    Analyze code blocks across worker processes. Blocks are independent, so
+    this scales with cores for very large notebooks; the LRU cache in
+    _analyze_code still applies within each worker.
+
+    Returns the same content-to-result mapping as batch_analyze_code_blocks,
+    with unparsable blocks omitted (they fall back to the per-block path and
+    surface their SyntaxError there). Returns an empty dict if the pool
+    cannot start, in which case callers should use the batch path.
+    """
+    unique_codes = list(dict.fromkeys(codes))
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor() as executor:
+            results = list(
+                executor.map(_analyze_code_or_none, unique_codes, chunksize=32)
+            )
+    except Exception:
+        return {}
+
+    return {
+        code: result
+        for code, result in zip(unique_codes, results)
+        if result is not None
+    }
+
+
 # Dummy implementation of inclause - jinjasql filters
 def inclause(value):
     return value
@@ -159,13 +367,37 @@ def sqlsafe(value):
     return value
 
 
+# The environment is stateless across parses, so build it (and register the
+# jinjasql filters) once instead of per SQL block. jinja2 is also the
+# slowest import in this script, so it is deferred until the first
+# templated SQL block actually needs it.
+# We don't use jinjasql directly as it is not compatible with the Jinja2
+# version we use in notebook.
+_JINJA_ENV = None
+
+
+def _get_jinja_env():
+    global _JINJA_ENV
+    if _JINJA_ENV is None:
+        from jinja2 import Environment
+
+        env = Environment()
+        env.filters["inclause"] = inclause
+        env.filters["bind"] = bind
+        env.filters["sqlsafe"] = sqlsafe
+        _JINJA_ENV = env
+    return _JINJA_ENV
+
+
 def sanitize_python_variable_name(name):
     """
     Python implementation of sanitizePythonVariableName from utils.ts
     """
-    sanitized = re.sub(r"\s+", "_", name)
-    sanitized = re.sub(r"[^0-9a-zA-Z_]", "", sanitized)
-    sanitized = re.sub(r"^[^a-zA-Z_]+", "", sanitized)
+    sanitized = WHITESPACE_RE.sub("_", name)
+    sanitized = INVALID_CHARS_RE.sub("", sanitized)
+    # After the pass above only [0-9a-zA-Z_] remain, so the invalid leading
+    # characters are exactly the digits — no third regex pass needed.
+    sanitized = sanitized.lstrip("0123456789")
 
     if sanitized == "":
         sanitized = "input_1"
@@ -173,49 +405,30 @@ def sanitize_python_variable_name(name):
     return sanitized
 
 
+@lru_cache(maxsize=512)
 def extract_jinja_variables(sql_code):
-    env = Environment()
-
-    # The SQL code can contain filters from jinjasql.
-    # We don't use jinjasql directly as it is not compatible with the Jinja2 version we use in notebook.
-    env.filters["inclause"] = inclause
-    env.filters["bind"] = bind
-    env.filters["sqlsafe"] = sqlsafe
+    # Plain SQL without Jinja delimiters cannot declare template variables,
+    # so skip the template parse entirely in that (common) case.
+    if "{{" in sql_code or "{%" in sql_code:
+        from jinja2 import meta
 
-    parsed_content = env.parse(sql_code)
-    jinja_variables = meta.find_undeclared_variables(parsed_content)
+        parsed_content = _get_jinja_env().parse(sql_code)
+        jinja_variables = meta.find_undeclared_variables(parsed_content)
+    else:
+        jinja_variables = set()
 
     # Look for table names after FROM, JOIN, etc. that could be variables
     sql_variables = set()
 
-    clean_sql = re.sub(r"\{\{.*?\}\}", "", sql_code)
-    clean_sql = re.sub(r"\{%.*?%\}", "", clean_sql, flags=re.DOTALL)
+    clean_sql = JINJA_EXPRESSION_RE.sub("", sql_code)
+    clean_sql = JINJA_STATEMENT_RE.sub("", clean_sql)
 
-    table_patterns = [
-        r"\bFROM\s+([a-zA-Z_][a-zA-Z0-9_]*)",
-        r"\bJOIN\s+([a-zA-Z_][a-zA-Z0-9_]*)",
-        r"\bINTO\s+([a-zA-Z_][a-zA-Z0-9_]*)",
-        r"\bUPDATE\s+([a-zA-Z_][a-zA-Z0-9_]*)",
-    ]
+    for match in TABLE_NAME_RE.findall(clean_sql):
+        if match.lower() not in SQL_KEYWORDS:
+            sql_variables.add(match)
 
-    for pattern in table_patterns:
-        matches = re.findall(pattern, clean_sql, re.IGNORECASE)
-        for match in matches:
-            if match.lower() not in [
-                "select",
-                "where",
-                "group",
-                "order",
-                "having",
-                "limit",
-                "offset",
-                "union",
-                "intersect",
-                "except",
-            ]:
-                sql_variables.add(match)
-
-    return jinja_variables.union(sql_variables)
+    # Frozen so the cached value cannot be mutated by callers
+    return frozenset(jinja_variables | sql_variables)
 
 
 # Why we are commenting out the lines instead of stripping them?
@@ -224,11 +437,9 @@ def extract_jinja_variables(sql_code):
 def comment_out_jupyter_bash_commands(blocks):
     for block in blocks:
         if "content" in block:
-            lines = block["content"].split("\n")
-            for i in range(len(lines)):
-                if lines[i].startswith("%") or lines[i].startswith("!"):
-                    lines[i] = "#" + lines[i]
-            block["content"] = "\n".join(lines)
+            # Prefix every line starting with % or ! in one C-level regex
+            # pass instead of splitting, looping and re-joining in Python.
+            block["content"] = MAGIC_LINE_RE.sub("#", block["content"])
     return blocks
 
 
@@ -242,40 +453,52 @@ def count_lines_of_code(content):
     return len(content.split("\n"))
 
 
+def _sorted_small(values):
+    # Most blocks define/use only a handful of names; skip sort setup for
+    # the 0/1-element cases, which dominate.
+    if len(values) <= 1:
+        return list(values)
+    return sorted(values)
+
+
+def _is_code_block(block):
+    return block.get("type") == "code" or block.get("type") is None
+
+
 def analyze_blocks(blocks):
     analysis = []
 
+    code_contents = [
+        block["content"] for block in blocks if _is_code_block(block) and "content" in block
+    ]
+    batch_results = {}
+    if len(code_contents) > PARALLEL_THRESHOLD:
+        batch_results = parallel_analyze_code_blocks(code_contents)
+    if not batch_results:
+        batch_results = batch_analyze_code_blocks(code_contents)
+
     for block in blocks:
         try:
             content = block.get("content", "")
             loc = count_lines_of_code(content)
 
-            if block.get("type") == "code" or block.get("type") is None:
-                block_defined, block_used, block_imported, block_packages = get_defined_used_variables(
-                    block
-                )
-                block_defined_list = list(block_defined)
-                block_defined_list.sort()
-                block_used_list = list(block_used)
-                block_used_list.sort()
-                block_imported_list = list(block_imported)
-                block_imported_list.sort()
-                block_packages_list = list(block_packages)
-                block_packages_list.sort()
+            if _is_code_block(block):
+                block_result = batch_results.get(content) if "content" in block else None
+                if block_result is None:
+                    block_result = get_defined_used_variables(block)
+                block_defined, block_used, block_imported, block_packages = block_result
                 analysis.append(
                     {
                         "id": block["id"],
-                        "definedVariables": block_defined_list,
-                        "usedVariables": block_used_list,
-                        "importedModules": block_imported_list,
-                        "importedPackages": block_packages_list,
+                        "definedVariables": _sorted_small(block_defined),
+                        "usedVariables": _sorted_small(block_used),
+                        "importedModules": _sorted_small(block_imported),
+                        "importedPackages": _sorted_small(block_packages),
                         "linesOfCode": loc,
                     }
                 )
             elif block["type"] == "sql":
-                jinja_variables = extract_jinja_variables(block["content"])
-                jinja_variables_list = list(jinja_variables)
-                jinja_variables_list.sort()
+                jinja_variables_list = _sorted_small(extract_jinja_variables(block["content"]))
 
                 output_variables = []
                 if (
@@ -324,7 +547,9 @@ def analyze_blocks(blocks):
                             block["metadata"]["deepnote_big_number_comparison_value"]
                         )
 
-                used_variables = list(set(used_variables))
+                # At most two entries here; no need to round-trip through a set
+                if len(used_variables) == 2 and used_variables[0] == used_variables[1]:
+                    used_variables.pop()
                 used_variables.sort()
 
                 analysis.append(
@@ -429,6 +654,21 @@ def analyze_blocks(blocks):
     return analysis
 
 
+def _load_json_file(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _dump_json_file(path, value):
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(value))
+    else:
+        with open(path, "w") as f:
+            json.dump(value, f)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Analyze AST of Python and SQL blocks")
     parser.add_argument("--input", required=True, help="JSON input file path")
@@ -438,21 +678,18 @@ def main():
 
     try:
         # Read input data from file
-        with open(args.input, "r") as f:
-            data = json.load(f)
+        data = _load_json_file(args.input)
 
         blocks = comment_out_jupyter_bash_commands(data["blocks"])
         result = analyze_blocks(blocks)
 
         # Write output data to file
-        with open(args.output, "w") as f:
-            json.dump(result, f)
+        _dump_json_file(args.output, result)
 
     except Exception as e:
         error_result = {"errorMessage": f"{e.__class__.__name__}: {str(e)}"}
         # Write error to output file
-        with open(args.output, "w") as f:
-            json.dump(error_result, f)
+        _dump_json_file(args.output, error_result)
         sys.exit(1)
 
 
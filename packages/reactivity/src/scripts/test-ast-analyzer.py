@@ -2,80 +2,106 @@
 """
 Test script to verify the local AST analyzer works correctly.
 This uses test cases from the original ast-analyzer repository.
+
+By default the analyzer module is imported and called in-process, which
+avoids paying interpreter startup and temp-file JSON I/O on every run.
+Pass --subprocess to exercise the real child-process entry point instead.
 """
 
+import importlib.util
 import json
 import tempfile
 import subprocess
 import sys
 import os
 
-def test_ast_analyzer():
-    """Test the local AST analyzer with sample data"""
-
-    test_blocks = [
-        {
-            "type": "code",
-            "id": "1",
-            "content": "a = 42"
-        },
-        {
-            "type": "code",
-            "id": "2",
-            "content": "b = 1 + a"
-        },
-        {
-            "type": "sql",
-            "id": "3",
-            "content": "SELECT * FROM users WHERE id == {{someVariable}}"
-        },
-        {
-            "type": "code",
-            "id": "4",
-            "content": "try:\n    raise ValueError('error')\nexcept Exception:\n    pass"
-        }
-    ]
-
-    expected_result = [
-        {
-            "id": "1",
-            "definedVariables": ["a"],
-            "usedVariables": [],
-            "importedModules": []
-        },
-        {
-            "id": "2",
-            "definedVariables": ["b"],
-            "usedVariables": ["a"],
-            "importedModules": []
-        },
-        {
-            "id": "3",
-            "definedVariables": [],
-            "usedVariables": ["someVariable", "users"],
-            "importedModules": []
-        },
-        {
-            "id": "4",
-            "definedVariables": [],
-            "usedVariables": [],
-            "importedModules": []
-        }
-    ]
-
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as input_file:
-        json.dump({"blocks": test_blocks}, input_file)
-        input_path = input_file.name
-
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as output_file:
-        output_path = output_file.name
-
-    try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        script_path = os.path.join(script_dir, 'ast-analyzer.py')
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ANALYZER_PATH = os.path.join(SCRIPT_DIR, 'ast-analyzer.py')
+
+TEST_BLOCKS = [
+    {
+        "type": "code",
+        "id": "1",
+        "content": "a = 42"
+    },
+    {
+        "type": "code",
+        "id": "2",
+        "content": "b = 1 + a"
+    },
+    {
+        "type": "sql",
+        "id": "3",
+        "content": "SELECT * FROM users WHERE id == {{someVariable}}"
+    },
+    {
+        "type": "code",
+        "id": "4",
+        "content": "try:\n    raise ValueError('error')\nexcept Exception:\n    pass"
+    }
+]
+
+EXPECTED_RESULT = [
+    {
+        "id": "1",
+        "definedVariables": ["a"],
+        "usedVariables": [],
+        "importedModules": [],
+        "importedPackages": [],
+        "linesOfCode": 1
+    },
+    {
+        "id": "2",
+        "definedVariables": ["b"],
+        "usedVariables": ["a"],
+        "importedModules": [],
+        "importedPackages": [],
+        "linesOfCode": 1
+    },
+    {
+        "id": "3",
+        "definedVariables": [],
+        "usedVariables": ["someVariable", "users"],
+        "importedModules": [],
+        "linesOfCode": 1
+    },
+    {
+        "id": "4",
+        "definedVariables": [],
+        "usedVariables": [],
+        "importedModules": [],
+        "importedPackages": [],
+        "linesOfCode": 4
+    }
+]
+
+
+def load_analyzer():
+    """Import ast-analyzer.py as a module (the dash keeps it off sys.path)."""
+    spec = importlib.util.spec_from_file_location("ast_analyzer", ANALYZER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_in_process(blocks):
+    """Run the analyzer by calling analyze_blocks directly."""
+    analyzer = load_analyzer()
+    prepared = analyzer.comment_out_jupyter_bash_commands(blocks)
+    return analyzer.analyze_blocks(prepared)
+
+
+def run_as_subprocess(blocks):
+    """Run the analyzer through its child-process entry point."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = os.path.join(temp_dir, 'input.json')
+        output_path = os.path.join(temp_dir, 'output.json')
+
+        with open(input_path, 'w') as f:
+            json.dump({"blocks": blocks}, f)
 
         result = subprocess.run([
-            sys.executable, script_path,
+            sys.executable, ANALYZER_PATH,
             '--input', input_path,
             '--output', output_path
         ], capture_output=True, text=True)
@@ -83,30 +109,31 @@ def test_ast_analyzer():
         if result.returncode != 0:
             print(f"Script failed with return code {result.returncode}")
             print(f"stderr: {result.stderr}")
-            return False
+            return None
 
         with open(output_path, 'r') as f:
-            actual_result = json.load(f)
-
-        if actual_result == expected_result:
-            print("✅ Test passed! AST analyzer works correctly.")
-            return True
-        else:
-            print("❌ Test failed! Results don't match expected output.")
-            print(f"Expected: {json.dumps(expected_result, indent=2)}")
-            print(f"Actual: {json.dumps(actual_result, indent=2)}")
+            return json.load(f)
+
+
+def test_ast_analyzer(use_subprocess=False):
+    """Test the AST analyzer with sample data"""
+
+    if use_subprocess:
+        actual_result = run_as_subprocess(TEST_BLOCKS)
+        if actual_result is None:
             return False
+    else:
+        actual_result = run_in_process(TEST_BLOCKS)
 
-    finally:
-        try:
-            os.unlink(input_path)
-        except FileNotFoundError:
-            pass
-        try:
-            os.unlink(output_path)
-        except FileNotFoundError:
-            pass
+    if actual_result == EXPECTED_RESULT:
+        print("✅ Test passed! AST analyzer works correctly.")
+        return True
+    else:
+        print("❌ Test failed! Results don't match expected output.")
+        print(f"Expected: {json.dumps(EXPECTED_RESULT, indent=2)}")
+        print(f"Actual: {json.dumps(actual_result, indent=2)}")
+        return False
 
 if __name__ == "__main__":
-    success = test_ast_analyzer()
+    success = test_ast_analyzer(use_subprocess="--subprocess" in sys.argv)
     sys.exit(0 if success else 1)
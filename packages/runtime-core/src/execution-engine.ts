@@ -194,6 +194,8 @@ export class ExecutionEngine {
       notebookIndex: number
     }> = []
     for (const notebook of notebooks) {
+      // Resolve the notebook's project index once instead of per block
+      const notebookIndex = file.project.notebooks.indexOf(notebook)
       const sortedBlocks = this.sortBlocks(notebook.blocks)
       for (const block of sortedBlocks) {
         if (isExecutableBlock(block)) {
@@ -203,7 +205,7 @@ export class ExecutionEngine {
           allExecutableBlocks.push({
             block,
             notebookName: notebook.name,
-            notebookIndex: file.project.notebooks.indexOf(notebook),
+            notebookIndex,
           })
         }
       }
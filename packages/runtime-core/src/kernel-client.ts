@@ -22,6 +22,9 @@ export interface ExecutionCallbacks {
 // See: https://jupyter-server.readthedocs.io/en/latest/developers/websocket-protocols.html
 const JUPYTER_BINARY_PROTOCOL = 'v1.kernel.websocket.jupyter.org'
 
+// Message types that carry user-visible output (checked for every iopub message)
+const OUTPUT_MESSAGE_TYPES: ReadonlySet<string> = new Set(['stream', 'execute_result', 'display_data', 'error'])
+
 /**
  * Creates a WebSocket factory that excludes the Jupyter binary wire protocol,
  * forcing JSON-only communication. Passed to ServerConnection.makeSettings()
@@ -93,25 +96,46 @@ export class KernelClient {
 
   /**
    * Wait for the kernel to reach idle status.
+   *
+   * Reacts to the kernel's statusChanged signal so the wait resolves as soon
+   * as the status flips, with a low-frequency poll as a safety net for
+   * kernels that never emit (and a hard timeout).
    */
   private async waitForKernelIdle(timeoutMs = 30000): Promise<void> {
-    if (!this.kernel) return
-
-    const startTime = Date.now()
-
-    while (this.kernel.status !== 'idle') {
-      if (Date.now() - startTime > timeoutMs) {
-        throw new Error(
-          `Kernel failed to reach idle status within ${timeoutMs}ms. Current status: ${this.kernel.status}`
-        )
+    const kernel = this.kernel
+    if (!kernel) return
+    if (kernel.status === 'idle') return
+
+    await new Promise<void>((resolve, reject) => {
+      let timeout: ReturnType<typeof setTimeout> | null = null
+      let interval: ReturnType<typeof setInterval> | null = null
+
+      const cleanup = () => {
+        if (timeout) clearTimeout(timeout)
+        if (interval) clearInterval(interval)
+        kernel.statusChanged?.disconnect(check)
       }
 
-      if (this.kernel.status === 'dead') {
-        throw new Error('Kernel is dead')
+      const check = () => {
+        if (kernel.status === 'idle') {
+          cleanup()
+          resolve()
+        } else if (kernel.status === 'dead') {
+          cleanup()
+          reject(new Error('Kernel is dead'))
+        }
       }
 
-      await new Promise(resolve => setTimeout(resolve, 100))
-    }
+      timeout = setTimeout(() => {
+        cleanup()
+        reject(
+          new Error(`Kernel failed to reach idle status within ${timeoutMs}ms. Current status: ${kernel.status}`)
+        )
+      }, timeoutMs)
+      interval = setInterval(check, 100)
+      kernel.statusChanged?.connect(check)
+      check()
+    })
   }
 
   /**
@@ -139,7 +163,7 @@ export class KernelClient {
 
         if (msgType === 'execute_input') {
           executionCount = (msg.content as { execution_count?: number }).execution_count ?? null
-        } else if (['stream', 'execute_result', 'display_data', 'error'].includes(msgType)) {
+        } else if (OUTPUT_MESSAGE_TYPES.has(msgType)) {
           const output = this.messageToOutput(msg)
           outputs.push(output)
           callbacks?.onOutput?.(output)